@@ -6,117 +6,25 @@ Processes PDF files containing project data and identifies livestock-related pro
 
 import pandas as pd
 import streamlit as st
-import PyPDF2
-import re
-import unicodedata
-from typing import List, Set, Tuple
+from typing import List, Optional, Set, Tuple
 import io
 import os
 from pathlib import Path
 
-class LivestockProjectFilter:
-    """Class to filter projects based on livestock-related keywords."""
-    
-    def __init__(self, keywords_file: str = "keywords.txt"):
-        """Initialize with keywords from file."""
-        self.keywords = self._load_keywords(keywords_file)
-        self.compiled_patterns = self._compile_patterns()
-    
-    def _load_keywords(self, keywords_file: str) -> List[str]:
-        """Load keywords from file."""
-        try:
-            with open(keywords_file, 'r', encoding='utf-8') as f:
-                keywords = [line.strip().lower() for line in f if line.strip()]
-            return keywords
-        except FileNotFoundError:
-            st.error(f"Keywords file '{keywords_file}' not found!")
-            return []
-    
-    def _compile_patterns(self) -> List[re.Pattern]:
-        """Compile regex patterns for efficient matching."""
-        patterns = []
-        for keyword in self.keywords:
-            # Create word boundary pattern for case-insensitive matching
-            pattern = re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE)
-            patterns.append(pattern)
-        return patterns
-    
-    def _normalize_text(self, text: str) -> str:
-        """Normalize text by handling unicode, spaces, and formatting."""
-        if pd.isna(text) or text is None:
-            return ""
-        
-        # Convert to string
-        text = str(text)
-        
-        # Unicode normalization (NFKD decomposes characters)
-        text = unicodedata.normalize('NFKD', text)
-        
-        # Replace non-breaking spaces with regular spaces
-        text = text.replace('\u00A0', ' ')  # Non-breaking space
-        text = text.replace('\u2007', ' ')  # Figure space
-        text = text.replace('\u2009', ' ')  # Thin space
-        text = text.replace('\u200A', ' ')  # Hair space
-        
-        # Collapse multiple spaces into single spaces
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Strip leading and trailing whitespace
-        text = text.strip()
-        
-        return text
-    
-    def find_keywords_in_text(self, text: str) -> List[str]:
-        """Find all matching keywords in the given text."""
-        if not text:
-            return []
-        
-        # Normalize the text
-        normalized_text = self._normalize_text(text)
-        
-        found_keywords = []
-        for i, pattern in enumerate(self.compiled_patterns):
-            if pattern.search(normalized_text):
-                found_keywords.append(self.keywords[i])
-        
-        # Remove duplicates while preserving order
-        return list(dict.fromkeys(found_keywords))
-    
-    def process_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Process DataFrame to add keyword columns."""
-        # Make a copy to avoid modifying original
-        result_df = df.copy()
-        
-        # Check if required columns exist
-        if 'Project Name' not in df.columns:
-            st.error("Column 'Project Name' not found in the data!")
-            return result_df
-        
-        if 'Project Description' not in df.columns:
-            st.error("Column 'Project Description' not found in the data!")
-            return result_df
-        
-        # Find keywords in Project Name
-        result_df['Keywords Found in Project Name'] = result_df['Project Name'].apply(
-            lambda x: ', '.join(self.find_keywords_in_text(x)) if self.find_keywords_in_text(x) else 'None'
-        )
-        
-        # Find keywords in Project Description
-        result_df['Keywords Found in Project Description'] = result_df['Project Description'].apply(
-            lambda x: ', '.join(self.find_keywords_in_text(x)) if self.find_keywords_in_text(x) else 'None'
-        )
-        
-        return result_df
+from livestock_filter import LivestockProjectFilter
+from process_local_pdfs import iter_pdf_pages
+
+
+@st.cache_resource
+def get_filter(keywords_file: str = "keywords.txt") -> LivestockProjectFilter:
+    """Load the keyword filter once and share it across reruns and sessions."""
+    return LivestockProjectFilter(keywords_file, report=st.error)
 
 
-def extract_text_from_pdf(pdf_file) -> str:
-    """Extract text from uploaded PDF file."""
+def extract_text_from_pdf(pdf_data: bytes) -> str:
+    """Extract text from the contents of an uploaded PDF file."""
     try:
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text
+        return "\n".join(iter_pdf_pages(pdf_data))
     except Exception as e:
         st.error(f"Error reading PDF: {str(e)}")
         return ""
@@ -170,6 +78,15 @@ def parse_pdf_to_dataframe(pdf_text: str) -> pd.DataFrame:
     return pd.DataFrame(projects)
 
 
+@st.cache_data(show_spinner=False)
+def load_pdf_projects(pdf_data: bytes) -> Optional[pd.DataFrame]:
+    """Extract and parse the projects in an uploaded PDF, cached by file contents."""
+    pdf_text = extract_text_from_pdf(pdf_data)
+    if not pdf_text:
+        return None
+    return parse_pdf_to_dataframe(pdf_text)
+
+
 def main():
     """Main Streamlit application."""
     st.set_page_config(
@@ -184,8 +101,8 @@ def main():
     Upload a PDF file with columns 'Project Name' and 'Project Description' to get started.
     """)
     
-    # Initialize the filter
-    filter_instance = LivestockProjectFilter()
+    # Initialize the filter (built once per server process)
+    filter_instance = get_filter()
     
     if not filter_instance.keywords:
         st.error("No keywords loaded. Please ensure keywords.txt file exists.")
@@ -206,13 +123,10 @@ def main():
     
     if uploaded_file is not None:
         with st.spinner("Processing PDF..."):
-            # Extract text from PDF
-            pdf_text = extract_text_from_pdf(uploaded_file)
+            # Extract and parse the PDF (reruns for the same file reuse the cached result)
+            df = load_pdf_projects(uploaded_file.getvalue())
             
-            if pdf_text:
-                # Parse PDF to DataFrame
-                df = parse_pdf_to_dataframe(pdf_text)
-                
+            if df is not None:
                 if not df.empty:
                     st.success(f"Extracted {len(df)} projects from PDF")
                     
@@ -277,7 +191,8 @@ def main():
                     
                     # Convert to Excel for download
                     excel_buffer = io.BytesIO()
-                    with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
+                    with pd.ExcelWriter(excel_buffer, engine='xlsxwriter',
+                                        engine_kwargs={'options': {'strings_to_urls': False}}) as writer:
                         filtered_df.to_excel(writer, sheet_name='Filtered Projects', index=False)
                         processed_df.to_excel(writer, sheet_name='All Projects', index=False)
                     
@@ -0,0 +1,293 @@
+"""
+Livestock Keyword Filter
+Shared keyword matching used by the Streamlit app and the local PDF processor.
+Optionally compile with mypyc (`mypyc livestock_filter.py`) for faster matching.
+"""
+
+import pandas as pd  # type: ignore[import-untyped, import-not-found]
+import re
+import threading
+import unicodedata
+from typing import Callable, Dict, List, Optional, Tuple
+from functools import lru_cache
+
+try:
+    import ahocorasick  # type: ignore[import-untyped, import-not-found]
+except ImportError:  # Fall back to a single alternation regex
+    ahocorasick = None  # type: ignore[assignment]
+
+try:
+    import hyperscan  # type: ignore[import-untyped, import-not-found]
+except ImportError:  # Optional: preferred matcher where its wheels are available
+    hyperscan = None  # type: ignore[assignment]
+
+# Optional: Arrow-backed string columns for vectorized normalization
+try:
+    import pyarrow  # type: ignore[import-untyped, import-not-found]
+    _TEXT_DTYPE = 'string[pyarrow]'
+except ImportError:
+    _TEXT_DTYPE = 'object'
+
+# Non-breaking, figure, thin and hair spaces all become regular spaces
+_SPACE_TABLE = str.maketrans({'\u00A0': ' ', '\u2007': ' ', '\u2009': ' ', '\u200A': ' '})
+_WS_RE = re.compile(r'\s+')
+
+
+def _nfkd(text: str) -> str:
+    """Apply NFKD normalization, skipping pure ASCII text which it leaves unchanged."""
+    return text if text.isascii() else unicodedata.normalize('NFKD', text)
+
+
+def _collapse_whitespace(text: str) -> str:
+    """Apply NFKD normalization and collapse whitespace runs into single spaces."""
+    return _WS_RE.sub(' ', _nfkd(text))
+
+
+def _is_word_char(char: str) -> bool:
+    """Return True for characters matched by the regex class \\w."""
+    return char.isalnum() or char == '_'
+
+
+def _is_word_boundary(text: str, pos: int) -> bool:
+    """Return True if position pos in text is a word boundary (regex \\b)."""
+    before = pos > 0 and _is_word_char(text[pos - 1])
+    after = pos < len(text) and _is_word_char(text[pos])
+    return before != after
+
+
+def _is_utf8_word_boundary(data: bytes, pos: int) -> bool:
+    """Return True if byte offset pos in UTF-8 encoded data is a word boundary (regex \\b)."""
+    before = after = False
+    if pos > 0:
+        # Step back over continuation bytes to the start of the preceding character
+        start = pos - 1
+        while start > 0 and 0x80 <= data[start] < 0xC0:
+            start -= 1
+        before = _is_word_char(data[start:pos].decode('utf-8'))
+    if pos < len(data):
+        end = pos + 1
+        while end < len(data) and 0x80 <= data[end] < 0xC0:
+            end += 1
+        after = _is_word_char(data[pos:end].decode('utf-8'))
+    return before != after
+
+
+def _print_error(message: str) -> None:
+    """Report a problem on the console."""
+    print(f"ERROR: {message}")
+
+
+class LivestockProjectFilter:
+    """Class to filter projects based on livestock-related keywords."""
+    
+    def __init__(self, keywords_file: str = "keywords.txt", report: Callable[[str], None] = _print_error):
+        """Initialize with keywords from file; problems are passed to report."""
+        self.report = report
+        self.keywords: List[str] = self._load_keywords(keywords_file)
+        self.keyword_index: Dict[str, int] = self._build_keyword_index()
+        self.compiled_union: Optional[re.Pattern] = self._compile_union_pattern()
+        self.automaton = self._build_automaton() if ahocorasick is not None else None
+        self.hs_database = self._compile_hyperscan() if hyperscan is not None and self.keywords else None
+        # Only the regex fallback needs to look for keywords hidden by overlapping matches
+        self.overlap_patterns: Dict[int, List[Tuple[int, re.Pattern]]] = (
+            self._build_overlap_patterns() if self.automaton is None and self.hs_database is None else {})
+        # A Hyperscan database has a single scratch space, so scans from threads
+        # sharing this filter (e.g. Streamlit sessions) must not overlap
+        self._scan_lock = threading.Lock()
+        # Repeated names and templated descriptions skip the scan; the cache is
+        # keyed by normalized text only and lives and dies with this keyword set
+        self._match_cached: Callable[[str], Tuple[str, ...]] = lru_cache(maxsize=8192)(self._match_normalized)
+    
+    def _load_keywords(self, keywords_file: str) -> List[str]:
+        """Load keywords from file."""
+        try:
+            with open(keywords_file, 'r', encoding='utf-8') as f:
+                keywords = [line.strip().lower() for line in f if line.strip()]
+            return keywords
+        except FileNotFoundError:
+            self.report(f"Keywords file '{keywords_file}' not found!")
+            return []
+    
+    def _build_keyword_index(self) -> Dict[str, int]:
+        """Map each keyword to the position of its first occurrence."""
+        keyword_index: Dict[str, int] = {}
+        for i, keyword in enumerate(self.keywords):
+            keyword_index.setdefault(keyword, i)
+        return keyword_index
+    
+    def _compile_union_pattern(self) -> Optional[re.Pattern]:
+        """Compile all keywords into one word-bounded alternation regex for lowercased text."""
+        if not self.keywords:
+            return None
+        # Longest keywords first so a shorter prefix never shadows a longer keyword
+        alternatives = sorted(self.keyword_index, key=len, reverse=True)
+        pattern = r'\b(?:' + '|'.join(re.escape(keyword) for keyword in alternatives) + r')\b'
+        return re.compile(pattern)
+    
+    def _build_overlap_patterns(self) -> Dict[int, List[Tuple[int, re.Pattern]]]:
+        """
+        Map each keyword's index to word-bounded patterns for the keywords that can
+        overlap it in text (one contains the other, or one ends the way the other begins).
+        """
+        def overlaps(first: str, second: str) -> bool:
+            return (first in second or second in first
+                    or any(first.endswith(second[:n]) for n in range(1, len(second)))
+                    or any(second.endswith(first[:n]) for n in range(1, len(first))))
+        
+        overlap_patterns: Dict[int, List[Tuple[int, re.Pattern]]] = {}
+        for keyword, i in self.keyword_index.items():
+            for other, j in self.keyword_index.items():
+                if i != j and overlaps(keyword, other):
+                    overlap_patterns.setdefault(i, []).append((j, re.compile(r'\b' + re.escape(other) + r'\b')))
+        return overlap_patterns
+    
+    def _build_automaton(self) -> "ahocorasick.Automaton":
+        """Build an Aho-Corasick automaton matching all keywords in a single pass."""
+        automaton = ahocorasick.Automaton()
+        for keyword, i in self.keyword_index.items():
+            automaton.add_word(keyword, (i, len(keyword)))
+        automaton.make_automaton()
+        return automaton
+    
+    def _compile_hyperscan(self) -> Optional["hyperscan.Database"]:
+        """Compile all keywords into one Hyperscan database for lowercased UTF-8 text."""
+        keywords = list(self.keyword_index)
+        # Hyperscan cannot match \b against Unicode word characters, so the
+        # patterns are plain literals and word boundaries are checked per match
+        flags = hyperscan.HS_FLAG_SOM_LEFTMOST | hyperscan.HS_FLAG_UTF8
+        database = hyperscan.Database()
+        try:
+            database.compile(
+                expressions=[re.escape(keyword).encode('utf-8') for keyword in keywords],
+                ids=[self.keyword_index[keyword] for keyword in keywords],
+                flags=[flags] * len(keywords),
+            )
+        except hyperscan.error as e:
+            self.report(f"Could not compile keywords with Hyperscan, using the fallback matcher: {str(e)}")
+            return None
+        return database
+    
+    def _normalize_text(self, text: str) -> str:
+        """Normalize text by handling unicode, spaces, and formatting."""
+        if pd.isna(text) or text is None:
+            return ""
+        
+        # Convert to string
+        text = str(text)
+        
+        # Unicode normalization (NFKD decomposes characters)
+        text = _nfkd(text)
+        
+        # Replace non-breaking spaces with regular spaces
+        text = text.translate(_SPACE_TABLE)
+        
+        # Collapse multiple spaces into single spaces
+        text = _WS_RE.sub(' ', text)
+        
+        # Strip leading and trailing whitespace
+        text = text.strip()
+        
+        return text
+    
+    def find_keywords_in_text(self, text: str) -> List[str]:
+        """Find all matching keywords in the given text."""
+        if not text:
+            return []
+        
+        # Normalize and lowercase once (keywords are already lowercase)
+        return list(self._match_cached(self._normalize_text(text).lower()))
+    
+    def _normalize_series(self, series: pd.Series) -> pd.Series:
+        """Normalize and lowercase a whole column using vectorized string operations."""
+        # Collapse whitespace with Python's re in the same pass as NFKD: Arrow's RE2
+        # \s matches fewer characters (not \x0b, \x85 or \u2028, for example)
+        text = series.fillna('').astype(str).map(_collapse_whitespace).astype(_TEXT_DTYPE)
+        return text.str.strip().str.lower()
+    
+    def _match_normalized(self, normalized_text: str) -> Tuple[str, ...]:
+        """Find all keywords in text that is already normalized and lowercased."""
+        if not normalized_text or not self.keywords:
+            return ()
+        
+        # Single pass over the text with whichever matcher is available
+        if self.hs_database is not None:
+            seen = self._match_hyperscan(normalized_text)
+        elif self.automaton is not None:
+            seen = self._match_automaton(normalized_text)
+        else:
+            seen = self._match_union(normalized_text)
+        
+        # Remove duplicates while preserving keyword order
+        return tuple(keyword for i, keyword in enumerate(self.keywords) if seen[i])
+    
+    def _match_hyperscan(self, text: str) -> bytearray:
+        """Flag the indices of keywords found by the Hyperscan database."""
+        seen = bytearray(len(self.keywords))
+        database = self.hs_database
+        if database is None:
+            return seen
+        data = text.encode('utf-8')
+        
+        def on_match(i: int, start: int, end: int, flags: int, context: object) -> None:
+            # Offsets are in bytes; keep only hits on word boundaries, as the regex \b would
+            if not seen[i] and _is_utf8_word_boundary(data, start) and _is_utf8_word_boundary(data, end):
+                seen[i] = 1
+        
+        with self._scan_lock:
+            database.scan(data, match_event_handler=on_match)
+        return seen
+    
+    def _match_automaton(self, text: str) -> bytearray:
+        """Flag the indices of keywords found by the Aho-Corasick automaton."""
+        seen = bytearray(len(self.keywords))
+        automaton = self.automaton
+        if automaton is None:
+            return seen
+        for end, (i, length) in automaton.iter(text):
+            # Keep only hits on word boundaries, as the regex \b would
+            if _is_word_boundary(text, end - length + 1) and _is_word_boundary(text, end + 1):
+                seen[i] = 1
+        return seen
+    
+    def _match_union(self, text: str) -> bytearray:
+        """Flag the indices of keywords found by the alternation regex."""
+        seen = bytearray(len(self.keywords))
+        pattern = self.compiled_union
+        if pattern is None:
+            return seen
+        found = {self.keyword_index[match] for match in pattern.findall(text)}
+        for i in found:
+            seen[i] = 1
+        
+        # findall only reports non-overlapping matches, and any keyword it skipped
+        # overlaps one it reported, so only those keywords need a search of their own
+        for i in found:
+            for j, keyword_pattern in self.overlap_patterns.get(i, ()):
+                if not seen[j] and keyword_pattern.search(text):
+                    seen[j] = 1
+        return seen
+    
+    def _format_keywords(self, normalized_text: str) -> str:
+        """Format the keywords found in normalized text as an output cell."""
+        return ', '.join(self._match_cached(normalized_text)) or 'None'
+    
+    def process_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Return a DataFrame with keyword columns added; the input is not modified."""
+        # Check if required columns exist
+        if 'Project Name' not in df.columns:
+            self.report("Column 'Project Name' not found in the data!")
+            return df
+        
+        if 'Project Description' not in df.columns:
+            self.report("Column 'Project Description' not found in the data!")
+            return df
+        
+        # Find keywords in Project Name and Project Description, normalizing each column in one pass
+        keyword_columns = {
+            f'Keywords Found in {column}': self._normalize_series(df[column]).map(self._format_keywords)
+            for column in ('Project Name', 'Project Description')
+        }
+        
+        # assign replaces results from an earlier run and, under Copy-on-Write,
+        # does not copy the (possibly large) input columns
+        return df.assign(**keyword_columns)
@@ -5,120 +5,136 @@ Processes PDF files in the current directory and creates output files with keywo
 """
 
 import pandas as pd
-import PyPDF2
+import pypdfium2 as pdfium
+import json
 import re
-import unicodedata
-from typing import List, Set, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import io
 import os
-import glob
+import sys
+import queue
+import threading
 from pathlib import Path
 from datetime import datetime
+from itertools import product
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import redirect_stdout
 import argparse
 
-class LivestockProjectFilter:
-    """Class to filter projects based on livestock-related keywords."""
-    
-    def __init__(self, keywords_file: str = "keywords.txt"):
-        """Initialize with keywords from file."""
-        self.keywords = self._load_keywords(keywords_file)
-        self.compiled_patterns = self._compile_patterns()
-    
-    def _load_keywords(self, keywords_file: str) -> List[str]:
-        """Load keywords from file."""
+from livestock_filter import LivestockProjectFilter
+
+# Every capitalization of ".pdf", so str.endswith can test names without lowercasing them
+PDF_SUFFIXES = tuple(''.join(chars) for chars in product('.', 'pP', 'dD', 'fF'))
+
+# Columns LivestockProjectFilter.process_dataframe needs in every parsed PDF
+REQUIRED_COLUMNS = ('Project Name', 'Project Description')
+
+# Line markers used by parse_pdf_to_dataframe, searched in lowercased lines
+_PROJECT_NAME_RE = re.compile(r'project:|project name:|title:|nombre del proyecto:')
+_DESCRIPTION_RE = re.compile(r'description:|summary:|descripción:')
+_STOP_RE = re.compile(r'project:|title:|budget:|cost:|date:')
+
+
+def scan_pdf_files(directory: str) -> List[os.DirEntry]:
+    """
+    Return directory entries for the PDF files in a directory.
+    Same matches as glob('*.[pP][dD][fF]') minus subdirectories, using the type
+    information os.scandir already returned instead of extra stat calls.
+    A missing or unreadable directory has no PDFs, as with glob.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return [entry for entry in entries
+                    if entry.name.endswith(PDF_SUFFIXES) and not entry.name.startswith('.')
+                    and entry.is_file()]
+    except OSError:
+        return []
+
+
+def is_pdf_file(path: str) -> bool:
+    """Return True if the file carries the %PDF header (readers accept it within the first 1 KB)."""
+    try:
+        with open(path, 'rb') as f:
+            return b'%PDF' in f.read(1024)
+    except OSError:
+        return False
+
+
+def filter_pdf_files(pdf_files: List[str]) -> List[str]:
+    """Keep only files that really are PDFs, reporting the ones skipped."""
+    # Each check is a single small read, so threads overlap the I/O
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        valid = list(executor.map(is_pdf_file, pdf_files))
+    
+    for pdf_file, is_valid in zip(pdf_files, valid):
+        if not is_valid:
+            print(f"⚠️ Skipping {os.path.basename(pdf_file)}: not a valid PDF file")
+    return [pdf_file for pdf_file, is_valid in zip(pdf_files, valid) if is_valid]
+
+
+def file_signature(path: str) -> Optional[List[int]]:
+    """Return the (size, modification time) of a file, or None if it cannot be read."""
+    try:
+        file_stat = os.stat(path)
+    except OSError:
+        return None
+    return [file_stat.st_size, file_stat.st_mtime_ns]
+
+
+def load_manifest(manifest_file: str, keywords_file: str) -> Dict[str, List[int]]:
+    """
+    Return the signatures of the PDFs recorded as processed in a manifest.
+    A manifest written with a different keyword list is ignored, since every result would change.
+    """
+    try:
+        with open(manifest_file, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    
+    if not isinstance(manifest, dict) or manifest.get('keywords') != file_signature(keywords_file):
+        return {}
+    files = manifest.get('files')
+    return files if isinstance(files, dict) else {}
+
+
+def save_manifest(manifest_file: str, keywords_file: str, files: Dict[str, List[int]]) -> None:
+    """Atomically write a manifest of processed PDFs; failures only cost reprocessing next time."""
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(manifest_file)), exist_ok=True)
+        tmp_file = f"{manifest_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'keywords': file_signature(keywords_file), 'files': files}, f)
+        os.replace(tmp_file, manifest_file)
+    except OSError:
+        pass
+
+
+# PDFium is not thread-safe, even across documents, so only one PDF is read at
+# a time per process (the Streamlit app reads uploads from several threads)
+_PDFIUM_LOCK = threading.Lock()
+
+
+def iter_pdf_pages(pdf_source) -> Iterator[str]:
+    """Yield the text of each PDF page, releasing every page as soon as it is read."""
+    with _PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(pdf_source)
         try:
-            with open(keywords_file, 'r', encoding='utf-8') as f:
-                keywords = [line.strip().lower() for line in f if line.strip()]
-            return keywords
-        except FileNotFoundError:
-            print(f"ERROR: Keywords file '{keywords_file}' not found!")
-            return []
-    
-    def _compile_patterns(self) -> List[re.Pattern]:
-        """Compile regex patterns for efficient matching."""
-        patterns = []
-        for keyword in self.keywords:
-            # Create word boundary pattern for case-insensitive matching
-            pattern = re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE)
-            patterns.append(pattern)
-        return patterns
-    
-    def _normalize_text(self, text: str) -> str:
-        """Normalize text by handling unicode, spaces, and formatting."""
-        if pd.isna(text) or text is None:
-            return ""
-        
-        # Convert to string
-        text = str(text)
-        
-        # Unicode normalization (NFKD decomposes characters)
-        text = unicodedata.normalize('NFKD', text)
-        
-        # Replace non-breaking spaces with regular spaces
-        text = text.replace('\u00A0', ' ')  # Non-breaking space
-        text = text.replace('\u2007', ' ')  # Figure space
-        text = text.replace('\u2009', ' ')  # Thin space
-        text = text.replace('\u200A', ' ')  # Hair space
-        
-        # Collapse multiple spaces into single spaces
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Strip leading and trailing whitespace
-        text = text.strip()
-        
-        return text
-    
-    def find_keywords_in_text(self, text: str) -> List[str]:
-        """Find all matching keywords in the given text."""
-        if not text:
-            return []
-        
-        # Normalize the text
-        normalized_text = self._normalize_text(text)
-        
-        found_keywords = []
-        for i, pattern in enumerate(self.compiled_patterns):
-            if pattern.search(normalized_text):
-                found_keywords.append(self.keywords[i])
-        
-        # Remove duplicates while preserving order
-        return list(dict.fromkeys(found_keywords))
-    
-    def process_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Process DataFrame to add keyword columns."""
-        # Make a copy to avoid modifying original
-        result_df = df.copy()
-        
-        # Check if required columns exist
-        if 'Project Name' not in df.columns:
-            print("WARNING: Column 'Project Name' not found in the data!")
-            return result_df
-        
-        if 'Project Description' not in df.columns:
-            print("WARNING: Column 'Project Description' not found in the data!")
-            return result_df
-        
-        # Find keywords in Project Name
-        result_df['Keywords Found in Project Name'] = result_df['Project Name'].apply(
-            lambda x: ', '.join(self.find_keywords_in_text(x)) if self.find_keywords_in_text(x) else 'None'
-        )
-        
-        # Find keywords in Project Description
-        result_df['Keywords Found in Project Description'] = result_df['Project Description'].apply(
-            lambda x: ', '.join(self.find_keywords_in_text(x)) if self.find_keywords_in_text(x) else 'None'
-        )
-        
-        return result_df
+            for page in pdf:
+                textpage = page.get_textpage()
+                try:
+                    yield textpage.get_text_range()
+                finally:
+                    textpage.close()
+                    page.close()
+        finally:
+            pdf.close()
 
 
-def extract_text_from_pdf(pdf_path: str) -> str:
-    """Extract text from PDF file."""
+def extract_text_from_pdf(pdf_path: str, pdf_data: Optional[bytes] = None) -> str:
+    """Extract text from PDF file, or from its already-read bytes if given."""
     try:
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        return text
+        return "\n".join(iter_pdf_pages(pdf_data if pdf_data is not None else pdf_path))
     except Exception as e:
         print(f"ERROR reading PDF {pdf_path}: {str(e)}")
         return ""
@@ -130,6 +146,7 @@ def parse_pdf_to_dataframe(pdf_text: str, pdf_filename: str) -> pd.DataFrame:
     Enhanced parser with multiple detection strategies.
     """
     lines = [line.strip() for line in pdf_text.split('\n') if line.strip()]
+    lower_lines = [line.lower() for line in lines]
     
     projects = []
     current_project = {}
@@ -137,18 +154,18 @@ def parse_pdf_to_dataframe(pdf_text: str, pdf_filename: str) -> pd.DataFrame:
     # Strategy 1: Look for structured project data
     for i, line in enumerate(lines):
         # Project name patterns
-        if any(pattern in line.lower() for pattern in ['project:', 'project name:', 'title:', 'nombre del proyecto:']):
+        if _PROJECT_NAME_RE.search(lower_lines[i]):
             if current_project:
                 projects.append(current_project)
             current_project = {'Project Name': line.split(':', 1)[1].strip() if ':' in line else line.strip()}
         
         # Description patterns  
-        elif any(pattern in line.lower() for pattern in ['description:', 'project description:', 'summary:', 'descripción:']):
+        elif _DESCRIPTION_RE.search(lower_lines[i]):
             if current_project:
                 desc = line.split(':', 1)[1].strip() if ':' in line else line.strip()
                 # Look ahead for continuation lines
                 j = i + 1
-                while j < len(lines) and not any(stop_word in lines[j].lower() for stop_word in ['project:', 'title:', 'budget:', 'cost:', 'date:']):
+                while j < len(lines) and not _STOP_RE.search(lower_lines[j]):
                     if lines[j].strip():
                         desc += ' ' + lines[j].strip()
                     j += 1
@@ -164,8 +181,8 @@ def parse_pdf_to_dataframe(pdf_text: str, pdf_filename: str) -> pd.DataFrame:
         
         # Look for table headers
         header_line = -1
-        for i, line in enumerate(lines):
-            if 'project' in line.lower() and ('name' in line.lower() or 'title' in line.lower()):
+        for i, line in enumerate(lower_lines):
+            if 'project' in line and ('name' in line or 'title' in line):
                 header_line = i
                 break
         
@@ -221,37 +238,41 @@ def parse_pdf_to_dataframe(pdf_text: str, pdf_filename: str) -> pd.DataFrame:
     return pd.DataFrame(projects)
 
 
-def process_single_pdf(pdf_path: str, filter_instance: LivestockProjectFilter, output_dir: str = "output") -> bool:
-    """Process a single PDF file and create output files."""
+def load_pdf_projects(pdf_path: str, pdf_data: Optional[bytes] = None) -> Optional[pd.DataFrame]:
+    """Extract and parse the project data from a single PDF file."""
     pdf_filename = os.path.basename(pdf_path)
     print(f"\n📄 Processing: {pdf_filename}")
     
     # Extract text from PDF
-    pdf_text = extract_text_from_pdf(pdf_path)
+    pdf_text = extract_text_from_pdf(pdf_path, pdf_data)
     
     if not pdf_text.strip():
         print(f"❌ Could not extract text from {pdf_filename}")
-        return False
+        return None
     
     # Parse PDF to DataFrame
     df = parse_pdf_to_dataframe(pdf_text, pdf_filename)
     
     if df.empty:
         print(f"❌ No project data found in {pdf_filename}")
-        return False
+        return None
     
     print(f"✅ Extracted {len(df)} project(s) from {pdf_filename}")
-    
-    # Process the DataFrame with keyword matching
-    processed_df = filter_instance.process_dataframe(df)
+    return df
+
+
+def write_pdf_outputs(pdf_filename: str, processed_df: pd.DataFrame, output_dir: str = "output",
+                      write_excel: bool = True) -> None:
+    """Report keyword statistics for one PDF and save its CSV and Excel results."""
+    print(f"\n📄 Results for: {pdf_filename}")
     
     # Calculate statistics
-    name_matches = len(processed_df[processed_df['Keywords Found in Project Name'] != 'None'])
-    desc_matches = len(processed_df[processed_df['Keywords Found in Project Description'] != 'None'])
-    total_matches = len(processed_df[
-        (processed_df['Keywords Found in Project Name'] != 'None') |
-        (processed_df['Keywords Found in Project Description'] != 'None')
-    ])
+    name_matched = processed_df['Keywords Found in Project Name'] != 'None'
+    desc_matched = processed_df['Keywords Found in Project Description'] != 'None'
+    matched_df = processed_df[name_matched | desc_matched]
+    name_matches = int(name_matched.sum())
+    desc_matches = int(desc_matched.sum())
+    total_matches = len(matched_df)
     
     print(f"🔍 Keyword Analysis Results:")
     print(f"   - Projects with name matches: {name_matches}")
@@ -265,65 +286,192 @@ def process_single_pdf(pdf_path: str, filter_instance: LivestockProjectFilter, o
     base_name = os.path.splitext(pdf_filename)[0]
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    csv_filename = f"{base_name}_livestock_analysis_{timestamp}.csv"
-    excel_filename = f"{base_name}_livestock_analysis_{timestamp}.xlsx"
+    stem = f"{base_name}_livestock_analysis_{timestamp}"
     
-    csv_path = os.path.join(output_dir, csv_filename)
-    excel_path = os.path.join(output_dir, excel_filename)
+    # Names differing only in the extension's case (rep.pdf, rep.PDF) share a
+    # base name, so number the outputs rather than overwrite a file from this second
+    output_name = stem
+    suffix = 1
+    while (os.path.exists(os.path.join(output_dir, f"{output_name}.csv"))
+           or os.path.exists(os.path.join(output_dir, f"{output_name}.xlsx"))):
+        suffix += 1
+        output_name = f"{stem}_{suffix}"
+    
+    csv_path = os.path.join(output_dir, f"{output_name}.csv")
+    excel_path = os.path.join(output_dir, f"{output_name}.xlsx")
     
     # Save as CSV
     processed_df.to_csv(csv_path, index=False)
     print(f"💾 Saved CSV: {csv_path}")
     
-    # Save as Excel with multiple sheets
-    with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
+    if not write_excel:
+        return
+    
+    # Summary statistics
+    summary_data = {
+        'Metric': [
+            'Total Projects',
+            'Projects with Name Matches',
+            'Projects with Description Matches', 
+            'Projects with Any Matches',
+            'Processing Date',
+            'Source File'
+        ],
+        'Value': [
+            len(processed_df),
+            name_matches,
+            desc_matches,
+            total_matches,
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            pdf_filename
+        ]
+    }
+    summary_df = pd.DataFrame(summary_data)
+    
+    # Save as Excel with multiple sheets (URL detection off: every cell is plain text)
+    with pd.ExcelWriter(excel_path, engine='xlsxwriter',
+                        engine_kwargs={'options': {'strings_to_urls': False}}) as writer:
         # All projects
         processed_df.to_excel(writer, sheet_name='All Projects', index=False)
         
         # Only projects with matches
-        matched_df = processed_df[
-            (processed_df['Keywords Found in Project Name'] != 'None') |
-            (processed_df['Keywords Found in Project Description'] != 'None')
-        ]
-        
         if not matched_df.empty:
             matched_df.to_excel(writer, sheet_name='Livestock Projects', index=False)
         
-        # Summary statistics
-        summary_data = {
-            'Metric': [
-                'Total Projects',
-                'Projects with Name Matches',
-                'Projects with Description Matches', 
-                'Projects with Any Matches',
-                'Processing Date',
-                'Source File'
-            ],
-            'Value': [
-                len(processed_df),
-                name_matches,
-                desc_matches,
-                total_matches,
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                pdf_filename
-            ]
-        }
-        summary_df = pd.DataFrame(summary_data)
         summary_df.to_excel(writer, sheet_name='Summary', index=False)
     
     print(f"💾 Saved Excel: {excel_path}")
-    return True
 
 
-def main():
-    """Main function to process PDF files in the current directory."""
+def _load_pdf_worker(pdf_item: Tuple[str, Optional[bytes]]) -> Tuple[str, Optional[pd.DataFrame], str]:
+    """Load a single prefetched PDF in a worker process, capturing its console output."""
+    pdf_path, pdf_data = pdf_item
+    output = io.StringIO()
+    with redirect_stdout(output):
+        try:
+            df = load_pdf_projects(pdf_path, pdf_data)
+        except Exception as e:
+            print(f"❌ Error processing {pdf_path}: {str(e)}")
+            df = None
+    return pdf_path, df, output.getvalue()
+
+
+def _prefetch_pdf_bytes(pdf_files: Iterable[str], depth: int = 4) -> Iterator[Tuple[str, Optional[bytes]]]:
+    """Yield (path, bytes) pairs, reading up to depth files ahead in a background thread."""
+    prefetched = queue.Queue(maxsize=depth)
+    
+    def reader():
+        for pdf_path in pdf_files:
+            try:
+                pdf_data = Path(pdf_path).read_bytes()
+            except OSError:
+                # Let the worker open the path itself and report the error
+                pdf_data = None
+            prefetched.put((pdf_path, pdf_data))
+        prefetched.put(None)
+    
+    threading.Thread(target=reader, daemon=True).start()
+    while (item := prefetched.get()) is not None:
+        yield item
+
+
+def _map_as_completed(executor: ProcessPoolExecutor, fn: Callable, items: Iterable,
+                      window: int) -> Iterator[Tuple[int, object]]:
+    """
+    Like executor.map, but keeps at most window items in flight and yields
+    (position, result) pairs as soon as each item completes.
+    """
+    in_flight = {}
+    
+    def completed():
+        nonlocal in_flight
+        done, pending = wait(in_flight, return_when=FIRST_COMPLETED)
+        finished = [(in_flight[future], future.result()) for future in done]
+        in_flight = {future: in_flight[future] for future in pending}
+        return finished
+    
+    for position, item in enumerate(items):
+        # Refill a worker as soon as any job finishes, not just the oldest one
+        if len(in_flight) >= window:
+            yield from completed()
+        in_flight[executor.submit(fn, item)] = position
+    while in_flight:
+        yield from completed()
+
+
+def _pdf_size(pdf_path: str) -> int:
+    """Return the size of a PDF file in bytes, or 0 if it cannot be read."""
+    try:
+        return os.path.getsize(pdf_path)
+    except OSError:
+        return 0
+
+
+def process_pdf_files(pdf_files: List[str], filter_instance: LivestockProjectFilter, output_dir: str = "output",
+                      write_excel: bool = True) -> List[str]:
+    """Process PDF files across worker processes and return the ones processed successfully."""
+    # Extract and parse PDF files in parallel while the next files are read from disk.
+    # Largest files go first so the slowest jobs start early and the workers finish
+    # at about the same time; each file's output is still printed in that order.
+    pdf_files = sorted(pdf_files, key=_pdf_size, reverse=True)
+    loaded = []
+    finished = {}
+    next_position = 0
+    max_workers = min(os.cpu_count() or 1, len(pdf_files))
+    sys.stdout.flush()  # Forked workers must not inherit (and re-emit) buffered output
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pdf_items = _prefetch_pdf_bytes(pdf_files, depth=max_workers)
+        for position, result in _map_as_completed(executor, _load_pdf_worker, pdf_items, window=2 * max_workers):
+            finished[position] = result
+            while next_position in finished:
+                pdf_file, df, output = finished.pop(next_position)
+                next_position += 1
+                print(output, end='', flush=True)
+                if df is None:
+                    continue
+                # Check each file on its own: the combined batch would fill a missing column with NaN
+                missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+                if missing:
+                    filter_instance.report(f"Column '{missing[0]}' not found in the data!")
+                    print(f"❌ Error processing {pdf_file}: no '{missing[0]}' column")
+                    continue
+                loaded.append((pdf_file, df))
+    
+    # Match keywords for all PDFs in one batch, then write each file's results
+    processed = []
+    if loaded:
+        combined_df = pd.concat([df.assign(_source=i) for i, (_, df) in enumerate(loaded)], ignore_index=True)
+        processed_df = filter_instance.process_dataframe(combined_df)
+        for i, file_df in processed_df.groupby('_source', sort=False):
+            pdf_file = loaded[i][0]
+            try:
+                write_pdf_outputs(os.path.basename(pdf_file), file_df.drop(columns='_source'),
+                                  output_dir, write_excel)
+                processed.append(pdf_file)
+            except Exception as e:
+                print(f"❌ Error processing {pdf_file}: {str(e)}")
+            # Each written file is a progress point, even when stdout is block-buffered
+            sys.stdout.flush()
+    
+    return processed
+
+
+def main(files: Optional[List[str]] = None, argv: Optional[List[str]] = None) -> int:
+    """
+    Main function to process PDF files in the current directory.
+    Callers that already found the PDFs can pass them as files to skip the directory scan.
+    Returns the process exit code.
+    """
     parser = argparse.ArgumentParser(description='Process PDF files for livestock keyword analysis')
     parser.add_argument('--input-dir', '-i', default='.', help='Input directory containing PDF files (default: current directory)')
     parser.add_argument('--output-dir', '-o', default='output', help='Output directory for results (default: output)')
     parser.add_argument('--keywords-file', '-k', default='keywords.txt', help='Keywords file (default: keywords.txt)')
     parser.add_argument('--file', '-f', help='Process specific PDF file instead of all PDFs in directory')
+    parser.add_argument('--no-excel', action='store_true', help='Only write CSV results, skipping the Excel workbook')
+    parser.add_argument('--from-stdin', action='store_true', help='Read the PDF files to process from stdin, one per line')
+    parser.add_argument('--manifest', help='JSON file recording the PDFs processed successfully, updated after each run')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     print("🐄 IDB Livestock Project Filter - Local Processing")
     print("=" * 50)
@@ -333,23 +481,28 @@ def main():
     
     if not filter_instance.keywords:
         print("❌ No keywords loaded. Exiting.")
-        return
+        return 1
     
     print(f"✅ Loaded {len(filter_instance.keywords)} keywords")
     print(f"📁 Input directory: {os.path.abspath(args.input_dir)}")
     print(f"📁 Output directory: {os.path.abspath(args.output_dir)}")
     
     # Find PDF files to process
-    if args.file:
+    if files is not None:
+        # Files already found by the caller
+        pdf_files = list(files)
+    elif args.from_stdin:
+        # Files listed by the parent process, which already scanned the directory
+        pdf_files = [os.fsdecode(line) for line in sys.stdin.buffer.read().splitlines() if line]
+    elif args.file:
         # Process specific file
         pdf_files = [args.file] if os.path.exists(args.file) else []
         if not pdf_files:
             print(f"❌ File not found: {args.file}")
-            return
+            return 1
     else:
-        # Find all PDF files in input directory
-        search_pattern = os.path.join(args.input_dir, "*.pdf")
-        pdf_files = glob.glob(search_pattern)
+        # Find all PDF files in input directory, skipping misnamed non-PDFs
+        pdf_files = filter_pdf_files([entry.path for entry in scan_pdf_files(args.input_dir)])
     
     if not pdf_files:
         print(f"❌ No PDF files found in {args.input_dir}")
@@ -357,20 +510,24 @@ def main():
         print("   1. Place your PDF files in this directory")
         print("   2. Run this script again")
         print("   3. Or specify a different directory with --input-dir")
-        return
+        return 1
     
     print(f"\n📋 Found {len(pdf_files)} PDF file(s) to process:")
-    for pdf_file in pdf_files:
-        print(f"   - {os.path.basename(pdf_file)}")
+    print('\n'.join(f"   - {os.path.basename(pdf_file)}" for pdf_file in pdf_files))
     
-    # Process each PDF file
-    processed_count = 0
-    for pdf_file in pdf_files:
-        try:
-            if process_single_pdf(pdf_file, filter_instance, args.output_dir):
-                processed_count += 1
-        except Exception as e:
-            print(f"❌ Error processing {pdf_file}: {str(e)}")
+    # Sign the files before processing, so a PDF changed meanwhile is processed again next time
+    signatures = {os.path.abspath(pdf_file): file_signature(pdf_file) for pdf_file in pdf_files}
+    
+    # Process the PDF files
+    processed = process_pdf_files(pdf_files, filter_instance, args.output_dir, not args.no_excel)
+    processed_count = len(processed)
+    
+    if args.manifest:
+        # Record the files that succeeded; failed ones are left out so only they are retried
+        done = {path: signature for path, signature in load_manifest(args.manifest, args.keywords_file).items()
+                if path not in signatures and os.path.exists(path)}
+        done.update((os.path.abspath(pdf_file), signatures[os.path.abspath(pdf_file)]) for pdf_file in processed)
+        save_manifest(args.manifest, args.keywords_file, done)
     
     print(f"\n🎉 Processing complete!")
     print(f"✅ Successfully processed: {processed_count}/{len(pdf_files)} files")
@@ -378,10 +535,16 @@ def main():
     
     if processed_count > 0:
         print(f"\n📊 Next steps:")
-        print(f"   - Check the '{args.output_dir}' folder for CSV and Excel files")
-        print(f"   - Each file contains keyword analysis results")
-        print(f"   - Excel files have multiple sheets: All Projects, Livestock Projects, Summary")
+        if args.no_excel:
+            print(f"   - Check the '{args.output_dir}' folder for CSV files")
+            print(f"   - Each file contains keyword analysis results")
+        else:
+            print(f"   - Check the '{args.output_dir}' folder for CSV and Excel files")
+            print(f"   - Each file contains keyword analysis results")
+            print(f"   - Excel files have multiple sheets: All Projects, Livestock Projects, Summary")
+    
+    return 0 if processed_count == len(pdf_files) else 1
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
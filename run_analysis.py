@@ -1,56 +1,230 @@
 #!/usr/bin/env python3
 """
 Quick PDF Analysis Script
-Simple script to process all PDF files in the current directory.
+Simple script to process all PDF files in a directory (the current one by default).
 """
 
-import subprocess
+import argparse
+import asyncio
+import pickle
 import sys
 import os
+import time
+from typing import Dict, List, Optional
 
-def main():
-    """Run the PDF analysis on all PDF files in current directory."""
-    print("🐄 IDB Livestock Project Filter")
-    print("Processing all PDF files in current directory...")
-    print("-" * 50)
+import process_local_pdfs
+
+# Resolve our own files next to this script, so it can be run from any directory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+KEYWORDS_FILE = os.path.join(SCRIPT_DIR, 'keywords.txt')
+
+# PDF listings are cached per directory, outside the directory itself so that
+# writing the cache does not change the directory's own modification time
+CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'idb_livestock', 'pdf_files.pickle')
+CACHE_TTL = 60  # seconds; older listings are rescanned even if the directory looks unchanged
+
+# Record of the PDFs analyzed successfully, kept in the output folder
+MANIFEST_NAME = '.processed_manifest.json'
+
+def _load_cache() -> Dict[str, dict]:
+    """Load cached PDF listings, or an empty cache if there is none."""
+    try:
+        with open(CACHE_FILE, 'rb') as f:
+            cache = pickle.load(f)
+    except Exception:
+        # Any unreadable cache (truncated, corrupt, written by other code) just means a rescan
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _valid_cache_entry(entry: object) -> bool:
+    """Return True if a cached listing has the shape _list_pdf_files writes."""
+    return (isinstance(entry, dict) and isinstance(entry.get('time'), (int, float))
+            and isinstance(entry.get('files'), list) and 'key' in entry)
+
+
+def _save_cache(cache: Dict[str, dict]) -> None:
+    """Atomically write the PDF listing cache; failures only cost a rescan next time."""
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        tmp_file = f"{CACHE_FILE}.{os.getpid()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(cache, f)
+        os.replace(tmp_file, CACHE_FILE)
+    except OSError:
+        pass
+
+
+def find_pdf_files(directory: str, use_cache: bool = True) -> List[str]:
+    """Return the paths of the PDF files in directory, which must already be absolute."""
+    # Check file headers on every run: contents can change without the listing changing
+    pdf_files = [os.path.join(directory, name) for name in _list_pdf_files(directory, use_cache)]
+    return process_local_pdfs.filter_pdf_files(pdf_files)
+
+
+def _list_pdf_files(directory: str, use_cache: bool) -> List[str]:
+    """Return the names of the *.pdf files in directory, using the cache if fresh."""
+    # Stat before scanning so a change during the scan invalidates the next lookup
+    dir_stat = os.stat(directory)
+    key = (dir_stat.st_mtime_ns, dir_stat.st_ino)
+    
+    cache = _load_cache() if use_cache else {}
+    cached = cache.get(directory)
+    if _valid_cache_entry(cached) and cached['key'] == key and time.time() - cached['time'] < CACHE_TTL:
+        return cached['files']
     
-    # Check if there are any PDF files
-    pdf_files = [f for f in os.listdir('.') if f.lower().endswith('.pdf')]
+    pdf_files = [entry.name for entry in process_local_pdfs.scan_pdf_files(directory)]
     
+    if use_cache:
+        cache[directory] = {'key': key, 'time': time.time(), 'files': pdf_files}
+        _save_cache(cache)
+    return pdf_files
+
+
+def _manifest_path(directory: str) -> str:
+    return os.path.join(directory, 'output', MANIFEST_NAME)
+
+
+def pending_pdf_files(pdf_files: List[str], directory: str, reprocess: bool = False) -> List[str]:
+    """Return the PDF files not processed successfully since they last changed."""
+    if reprocess:
+        return list(pdf_files)
+    done = process_local_pdfs.load_manifest(_manifest_path(directory), KEYWORDS_FILE)
+    return [pdf for pdf in pdf_files
+            if (signature := process_local_pdfs.file_signature(pdf)) is None
+            or done.get(os.path.abspath(pdf)) != signature]
+
+
+def announce_pdf_files(pdf_files: List[str], todo: List[str], directory: str) -> bool:
+    """Print the PDF files about to be analyzed; return False if there is nothing to do."""
     if not pdf_files:
-        print("❌ No PDF files found in current directory.")
+        print(f"❌ No PDF files found in {directory}")
         print("📝 To use this tool:")
         print("   1. Drag and drop your PDF files into this folder")
         print("   2. Run this script again: python3 run_analysis.py")
-        return
+        return False
     
     print(f"📋 Found {len(pdf_files)} PDF file(s):")
-    for pdf in pdf_files:
-        print(f"   - {pdf}")
+    print('\n'.join(f"   - {os.path.basename(pdf)}" for pdf in pdf_files))
+    
+    unchanged = len(pdf_files) - len(todo)
+    if unchanged:
+        print(f"⏭️  Skipping {unchanged} PDF file(s) already analyzed and unchanged since")
+    if not todo:
+        print("\n✅ Nothing new to analyze.")
+        sys.stdout.flush()
+        return False
     
     print("\n🔄 Starting analysis...")
+    sys.stdout.flush()
+    return True
+
+
+async def _relay(stream: asyncio.StreamReader, target) -> None:
+    """Copy a child process stream to one of our own, line by line as it arrives."""
+    async for line in stream:
+        target.buffer.write(line)
+        target.buffer.flush()
+
+
+def processing_args(directory: str) -> List[str]:
+    """Command-line arguments for process_local_pdfs that point it at directory."""
+    return [
+        '--input-dir', directory,
+        '--output-dir', os.path.join(directory, 'output'),
+        '--keywords-file', KEYWORDS_FILE,
+        '--manifest', _manifest_path(directory),
+    ]
+
+
+async def run_isolated(directory: str, use_cache: bool = True, reprocess: bool = False) -> Optional[int]:
+    """
+    Run process_local_pdfs.py in a separate process and return its exit code,
+    or None if there was nothing to analyze.
+    """
+    # Start the child first so its interpreter start-up and imports overlap the
+    # directory scan; its output is relayed once our own listing has been printed
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.join(SCRIPT_DIR, 'process_local_pdfs.py'),
+        *processing_args(directory), '--from-stdin',
+        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        env={**os.environ, 'PYTHONUNBUFFERED': '1'}
+    )
+    pdf_files = await asyncio.to_thread(find_pdf_files, directory, use_cache)
+    todo = await asyncio.to_thread(pending_pdf_files, pdf_files, directory, reprocess)
+    
+    if not announce_pdf_files(pdf_files, todo, directory):
+        proc.terminate()
+        await proc.wait()
+        return None
+    
+    # Hand the PDF list to the child so it does not scan the directory again
+    proc.stdin.write(b'\n'.join(os.fsencode(pdf) for pdf in todo))
+    await proc.stdin.drain()
+    proc.stdin.close()
+    
+    sys.stdout.flush()
+    await asyncio.gather(_relay(proc.stdout, sys.stdout), _relay(proc.stderr, sys.stderr))
+    return await proc.wait()
+
+
+def main():
+    """Run the PDF analysis on all PDF files in the given directory."""
+    parser = argparse.ArgumentParser(description='Analyze all PDF files in a directory')
+    parser.add_argument('dir', nargs='?', default='.',
+                        help='Directory containing the PDF files (default: current directory)')
+    parser.add_argument('--isolate', action='store_true',
+                        help='Run the analysis in a separate Python process (isolates crashes in PDF libraries)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always rescan the directory instead of reusing a recent PDF listing')
+    parser.add_argument('--all', action='store_true',
+                        help='Analyze every PDF, including those already analyzed and unchanged since')
+    args = parser.parse_args()
+    
+    # Resolve the directory once; everything below works with this absolute path
+    root = os.path.realpath(args.dir)
+    if not os.path.isdir(root):
+        print(f"❌ Directory not found: {args.dir}")
+        sys.exit(1)
+    
+    # Block-buffer our own output and flush explicitly at phase boundaries
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=False, write_through=False)
+    
+    print('\n'.join([
+        "🐄 IDB Livestock Project Filter",
+        f"Processing all PDF files in {root}...",
+        "-" * 50,
+    ]))
     
-    # Run the main processing script
     try:
-        result = subprocess.run([
-            sys.executable, 'process_local_pdfs.py'
-        ], capture_output=True, text=True)
-        
-        # Print the output
-        print(result.stdout)
-        
-        if result.stderr:
-            print("Warnings/Errors:")
-            print(result.stderr)
+        if args.isolate:
+            returncode = asyncio.run(run_isolated(root, not args.no_cache, args.all))
+            if returncode is None:
+                return
+        else:
+            # Check if there are any PDF files
+            pdf_files = find_pdf_files(root, not args.no_cache)
+            todo = pending_pdf_files(pdf_files, root, args.all)
+            if not announce_pdf_files(pdf_files, todo, root):
+                return
+            
+            # Process in this interpreter, reusing the PDF list found above
+            returncode = process_local_pdfs.main(todo, argv=processing_args(root))
         
-        if result.returncode == 0:
+        if returncode == 0:
             print("\n✅ Analysis completed successfully!")
-            print("📁 Check the 'output' folder for your results.")
+            print(f"📁 Check the '{os.path.join(root, 'output')}' folder for your results.")
         else:
-            print(f"\n❌ Analysis failed with return code: {result.returncode}")
+            print(f"\n❌ Analysis failed with return code: {returncode}")
+            # Pass the failure on to the shell; a child killed by a signal exits like the shell reports it
+            sys.exit(128 - returncode if returncode < 0 else returncode)
             
-    except Exception as e:
-        print(f"❌ Error running analysis: {str(e)}")
+    except KeyboardInterrupt:
+        print("\n⛔ Analysis aborted.")
+        sys.exit(130)
+    finally:
+        sys.stdout.flush()
 
 if __name__ == "__main__":
     main()